@@ -4,15 +4,117 @@ Safely evaluates rule conditions against normalized credit data records
 
 Key Features:
 - Safe evaluation using asteval (no exec/eval vulnerabilities)
+- Whitelisted comparison/boolean conditions run as compiled bytecode
 - Comprehensive default values for all credit report variables
 - Automatic type coercion and validation
 - Detailed error logging and debugging support
+- Safe to share between threads (one asteval interpreter per thread)
 """
 
-from typing import Dict, Any, Set, Tuple
+from collections import ChainMap, Counter, OrderedDict
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import Callable, Dict, Any, FrozenSet, Iterable, List, Optional, Tuple, Union
 from asteval import Interpreter
+import ast
 import logging
-import re
+import threading
+import weakref
+
+
+# AST node types allowed on the compiled (CPython bytecode) fast path.
+# No calls, attributes or subscripts - only names, literals and operators.
+_FAST_PATH_NODES = (
+    ast.Expression, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot
+)
+
+# JavaScript-style boolean literals accepted in rule conditions, bound as
+# constants in both evaluators instead of being rewritten in the text
+_BOOL_CONSTANTS = MappingProxyType({'true': True, 'false': False})
+
+# Globals for fast-path evaluation (no builtins reachable)
+_SAFE_GLOBALS = {'__builtins__': {}, **_BOOL_CONSTANTS}
+
+logger = logging.getLogger(__name__)
+
+
+def _coerce_float(field: str, value: Any) -> float:
+    """Coerce a numeric field to float (0.0 if not convertible)"""
+    try:
+        return float(value)
+    except (ValueError, TypeError, OverflowError):
+        logger.warning(f"Could not convert {field}={value} to float, using 0.0")
+        return 0.0
+
+
+def _coerce_int(field: str, value: Any) -> int:
+    """Coerce an integer field to int (0 if not convertible)"""
+    try:
+        return int(float(value))
+    except (ValueError, TypeError, OverflowError):
+        logger.warning(f"Could not convert {field}={value} to int, using 0")
+        return 0
+
+
+def _coerce_bool(field: str, value: Any) -> bool:
+    """Coerce a boolean field to bool"""
+    return bool(value)
+
+
+class _Counters:
+    """Evaluation statistics counters"""
+    
+    __slots__ = ('total', 'success', 'fail', 'missing')
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.total = 0
+        self.success = 0
+        self.fail = 0
+        self.missing = Counter()
+    
+    def add(self, other: '_Counters'):
+        self.total += other.total
+        self.success += other.success
+        self.fail += other.fail
+        self.missing.update(other.missing)
+
+
+class _ThreadState(_Counters):
+    """Per-thread asteval interpreter and statistics counters"""
+    
+    __slots__ = ('aeval', 'base_symtable')
+    
+    def __init__(self):
+        # Initialize asteval interpreter with security settings
+        self.aeval = Interpreter(
+            use_numpy=False,      # Don't load numpy (security)
+            minimal=True,         # Minimal symbol table
+            max_time=0.1         # Max 100ms per evaluation
+        )
+        self.aeval.symtable.update(_BOOL_CONSTANTS)
+        self.base_symtable = self.aeval.symtable
+        super().__init__()
+
+
+class _ThreadExit:
+    """Held in a thread's locals only; collected when the thread ends"""
+    
+    __slots__ = ('__weakref__',)
+
+
+def _retire_state(parser_ref: 'weakref.ref', state: _ThreadState):
+    """weakref.finalize callback: fold a finished thread's state into its parser"""
+    parser = parser_ref()
+    if parser is not None:
+        parser._retire(state)
 
 
 class ParserError(Exception):
@@ -20,6 +122,108 @@ class ParserError(Exception):
     pass
 
 
+class CompiledCondition:
+    """
+    Compile artifacts of one normalized condition
+    
+    Attributes:
+        normalized: Normalized condition string
+        parsed: asteval AST (used when there is no fast-path code)
+        variables: Referenced variable names
+        plan: (name, coerce function or None) pairs for the variables
+        code: Fast-path code object, or None
+    """
+    
+    __slots__ = ('normalized', 'parsed', 'variables', 'plan', 'code')
+    
+    def __init__(self, normalized: str, parsed: ast.Module, variables: FrozenSet[str],
+                 plan: Tuple[Tuple[str, Any], ...], code: Any):
+        self.normalized = normalized
+        self.parsed = parsed
+        self.variables = variables
+        self.plan = plan
+        self.code = code
+
+
+class ConditionSet:
+    """
+    Several compiled conditions evaluated together (see ConditionParser.compile_many)
+    
+    Fast-path conditions read one shared prepared variable dict per record.
+    """
+    
+    __slots__ = ('parser', 'entries', 'shared_plan')
+    
+    def __init__(self, parser: 'ConditionParser', entries: List[Tuple[str, CompiledCondition, bool]],
+                 shared_plan: Tuple[Tuple[str, Any], ...]):
+        self.parser = parser
+        self.entries = entries
+        self.shared_plan = shared_plan
+    
+    def __call__(self, data: Dict[str, Any]) -> List[Any]:
+        """Evaluate every condition against one record"""
+        return self._evaluate(data, self.parser._apply_coercion_plan(data, self.shared_plan))
+    
+    def _evaluate(self, data: Dict[str, Any], shared: Dict[str, Any]) -> List[Any]:
+        evaluate_prepared = self.parser._evaluate_prepared
+        evaluate_compiled = self.parser._evaluate_compiled
+        results = []
+        for condition, compiled, fast in self.entries:
+            try:
+                if fast:
+                    results.append(evaluate_prepared(condition, compiled, shared))
+                else:
+                    results.append(evaluate_compiled(condition, compiled, data))
+            except ParserError as e:
+                results.append(e)
+        return results
+
+
+class _CompileFailure:
+    """Cached marker for a condition that failed to compile"""
+    
+    __slots__ = ('message', 'log_prefix', 'error')
+    
+    def __init__(self, message: str, log_prefix: str, error: Exception):
+        self.message = message
+        self.log_prefix = log_prefix
+        self.error = str(error)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_condition_cached(condition: str) -> str:
+    """
+    Normalize a condition string (memoized - rules reuse a small set of strings)
+    
+    Args:
+        condition: Raw, non-empty condition string
+        
+    Returns:
+        Normalized condition string
+    """
+    # Clean up whitespace (true/false are bound as constants, not rewritten)
+    return ' '.join(condition.split())
+
+
+def _extract_names(tree: ast.AST) -> FrozenSet[str]:
+    """
+    Collect the variable names referenced by a parsed condition
+    
+    Unlike a lexical scan this ignores identifiers inside string literals.
+    The true/false constants are not variables and are left out.
+    
+    Args:
+        tree: Parsed condition AST
+        
+    Returns:
+        Frozen set of referenced names
+    """
+    return frozenset(
+        node.id for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and node.id not in _BOOL_CONSTANTS
+    )
+
+
 class ConditionParser:
     """
     Safely evaluates boolean conditions against credit data records.
@@ -31,7 +235,8 @@ class ConditionParser:
     """
     
     # Define all possible variables used in credit rules with their default values
-    DEFAULT_VALUES = {
+    # (read-only: shared by every evaluation without copying)
+    DEFAULT_VALUES = MappingProxyType({
         # === Loan-Level Numeric Variables ===
         'creditutilizationratio': 0.0,
         'balance': 0.0,
@@ -91,7 +296,31 @@ class ConditionParser:
         'name': '',
         'ic_number': '',
         'ctos_score': 0
-    }
+    })
+    
+    # Fields coerced to float before evaluation
+    NUMERIC_FIELDS = frozenset((
+        'creditutilizationratio', 'balance', 'limit', 'utilization',
+        'secured_loan_ratio', 'application_decline_rate', 'oldest_account_years'
+    ))
+    
+    # Fields coerced to int before evaluation
+    INTEGER_FIELDS = frozenset((
+        'payment_conduct_code', 'numberofloans', 'numapplicationslast12months',
+        'numpendingapplications', 'distinct_account_types', 'oldest_account_months',
+        'accounts_per_lender', 'recent_enquiries', 'trade_ref_reminder_count',
+        'legal_cases_settled', 'legal_cases_active', 'director_windingup_company',
+        'mon_arrears', 'inst_arrears', 'ctos_score'
+    ))
+    
+    # Fields coerced to bool before evaluation
+    BOOLEAN_FIELDS = frozenset((
+        'has_credit_card', 'has_installment_loan', 'bankruptcy_active',
+        'payment_conduct_all_zero', 'is_revolving', 'is_secured'
+    ))
+    
+    # Maximum number of parsed conditions kept in the AST cache
+    AST_CACHE_SIZE = 4096
     
     def __init__(self, debug: bool = False):
         """
@@ -100,34 +329,69 @@ class ConditionParser:
         Args:
             debug: Enable debug logging for condition evaluation
         """
-        # Initialize asteval interpreter with security settings
-        self.aeval = Interpreter(
-            use_numpy=False,      # Don't load numpy (security)
-            minimal=True,         # Minimal symbol table
-            max_time=0.1         # Max 100ms per evaluation
-        )
+        # asteval interpreters and counters are created lazily per thread;
+        # _states holds the live threads' states for get_statistics(), and a
+        # finished thread's counters are folded into _retired (its
+        # interpreter is released with it). Reentrant: the fold can run from
+        # garbage collection in a thread that already holds the lock.
+        self._tls = threading.local()
+        self._states: List[_ThreadState] = []
+        self._retired = _Counters()
+        self._states_lock = threading.RLock()
+        
+        # Parsed condition cache (normalized condition -> AST), shared by threads
+        self._ast_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         # Set up logging
         self.logger = logging.getLogger(__name__)
         if debug:
             self.logger.setLevel(logging.DEBUG)
         
-        # Statistics for monitoring
-        self.stats = {
-            'total_evaluations': 0,
-            'successful_evaluations': 0,
-            'failed_evaluations': 0,
-            'missing_variables': {}
-        }
+        # Resolved once so the hot path skips the logger level lookup
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
+        
+        # Statistics for monitoring (plain counters; see get_statistics())
+        self.reset_statistics()
+
+    def _state(self) -> _ThreadState:
+        """
+        Get the calling thread's interpreter/counter state, creating it on first use
+        
+        Returns:
+            _ThreadState for the current thread
+        """
+        state = getattr(self._tls, 'state', None)
+        if state is None:
+            state = _ThreadState()
+            self._tls.state = state
+            # The thread's locals are cleared when it ends, which retires the state
+            self._tls.exit = _ThreadExit()
+            weakref.finalize(self._tls.exit, _retire_state, weakref.ref(self), state)
+            with self._states_lock:
+                self._states.append(state)
+        return state
+
+    def _retire(self, state: _ThreadState):
+        """Fold a finished thread's counters into the totals and drop its state"""
+        with self._states_lock:
+            self._states.remove(state)
+            self._retired.add(state)
+
+    @property
+    def aeval(self) -> Interpreter:
+        """asteval interpreter of the calling thread"""
+        return self._state().aeval
 
     def _normalize_condition(self, condition: str) -> str:
         """
         Normalize condition syntax for Python evaluation
         
         Handles:
-        - JavaScript-style booleans (true/false -> True/False)
         - Whitespace cleanup
-        - Common syntax variations
+        
+        JavaScript-style booleans (true/false) need no rewriting; both
+        evaluators bind them as constants.
         
         Args:
             condition: Raw condition string
@@ -138,125 +402,125 @@ class ConditionParser:
         if not condition:
             return ""
         
-        # Replace JavaScript-style booleans
-        replacements = {
-            '== true': '== True',
-            '== false': '== False',
-            '!= true': '!= True',
-            '!= false': '!= False',
-            ' true ': ' True ',
-            ' false ': ' False '
-        }
+        return _normalize_condition_cached(condition)
+
+    def _compile_condition(self, condition: str) -> Union[CompiledCondition, _CompileFailure]:
+        """
+        Parse a normalized condition, reusing the cached result when available
+        
+        Conditions built only from known variables, literals and
+        comparison/boolean/arithmetic operators are also compiled to a
+        Python code object so they can skip the asteval tree-walk.
+        Conditions that fail to parse are cached too, as a _CompileFailure.
         
-        normalized = condition
-        for old, new in replacements.items():
-            normalized = normalized.replace(old, new)
+        Args:
+            condition: Normalized condition string
+            
+        Returns:
+            CompiledCondition, or a _CompileFailure
+        """
+        with self._cache_lock:
+            compiled = self._ast_cache.get(condition)
+            if compiled is not None:
+                self._ast_cache.move_to_end(condition)
+                return compiled
+        
+        aeval = self._state().aeval
+        aeval.error = []
+        aeval.error_msg = None
+        try:
+            parsed = aeval.parse(condition)
+            names = _extract_names(parsed)
+            compiled = CompiledCondition(condition, parsed, names, self._coercion_plan(names),
+                                         self._compile_fast_path(parsed))
+        except SyntaxError as e:
+            # Invalid Python syntax
+            compiled = _CompileFailure(f"Invalid condition syntax: {str(e)}", "SyntaxError in condition", e)
+        except Exception as e:
+            compiled = _CompileFailure(f"Failed to evaluate condition: {str(e)}", "Unexpected error compiling condition", e)
         
-        # Clean up whitespace
-        normalized = ' '.join(normalized.split())
+        with self._cache_lock:
+            self._ast_cache[condition] = compiled
+            if len(self._ast_cache) > self.AST_CACHE_SIZE:
+                self._ast_cache.popitem(last=False)
         
-        return normalized
+        return compiled
 
-    def _extract_variable_names(self, condition: str) -> Set[str]:
+    def _compile_fast_path(self, parsed: ast.Module) -> Any:
         """
-        Extract all variable names from a condition string
+        Compile a parsed condition to a code object if it is whitelisted
         
         Args:
-            condition: Condition string to parse
+            parsed: Module AST returned by Interpreter.parse()
             
         Returns:
-            Set of variable names found in the condition
+            Code object for eval(), or None if asteval must be used
         """
-        # Match valid Python identifiers
-        pattern = r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b'
-        variables = set(re.findall(pattern, condition))
+        if len(parsed.body) != 1 or not isinstance(parsed.body[0], ast.Expr):
+            return None
         
-        # Remove Python keywords and operators
-        python_keywords = {
-            'and', 'or', 'not', 'in', 'is', 
-            'True', 'False', 'None',
-            'if', 'else', 'elif', 'for', 'while'
-        }
+        tree = ast.Expression(body=parsed.body[0].value)
+        for node in ast.walk(tree):
+            if not isinstance(node, _FAST_PATH_NODES):
+                return None
+            if isinstance(node, ast.Name) and node.id not in self.DEFAULT_VALUES and node.id not in _BOOL_CONSTANTS:
+                return None
         
-        return variables - python_keywords
+        return compile(tree, '<rule>', 'eval')
 
-    def _prepare_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _coercer_for(self, field: str) -> Optional[Callable[[str, Any], Any]]:
         """
-        Prepare data for evaluation by adding defaults and type coercion
+        Select the type coercion function for a variable
         
         Args:
-            data: Raw input data dictionary
+            field: Variable name
             
         Returns:
-            Prepared data with defaults and proper types
-        """
-        # Start with defaults
-        prepared = self.DEFAULT_VALUES.copy()
-        
-        # Override with actual data
-        for key, value in data.items():
-            if value is not None:
-                prepared[key] = value
-        
-        # Type coercion for numeric fields
-        numeric_fields = [
-            'creditutilizationratio', 'balance', 'limit', 'utilization',
-            'secured_loan_ratio', 'application_decline_rate', 'oldest_account_years'
-        ]
-        
-        for field in numeric_fields:
-            if field in prepared and prepared[field] is not None:
-                try:
-                    prepared[field] = float(prepared[field])
-                except (ValueError, TypeError):
-                    self.logger.warning(f"Could not convert {field}={prepared[field]} to float, using 0.0")
-                    prepared[field] = 0.0
-        
-        # Integer fields
-        integer_fields = [
-            'payment_conduct_code', 'numberofloans', 'numapplicationslast12months',
-            'numpendingapplications', 'distinct_account_types', 'oldest_account_months',
-            'accounts_per_lender', 'recent_enquiries', 'trade_ref_reminder_count',
-            'legal_cases_settled', 'legal_cases_active', 'director_windingup_company',
-            'mon_arrears', 'inst_arrears', 'ctos_score'
-        ]
-        
-        for field in integer_fields:
-            if field in prepared and prepared[field] is not None:
-                try:
-                    prepared[field] = int(float(prepared[field]))
-                except (ValueError, TypeError):
-                    self.logger.warning(f"Could not convert {field}={prepared[field]} to int, using 0")
-                    prepared[field] = 0
-        
-        # Boolean fields
-        boolean_fields = [
-            'has_credit_card', 'has_installment_loan', 'bankruptcy_active',
-            'payment_conduct_all_zero', 'is_revolving', 'is_secured'
-        ]
-        
-        for field in boolean_fields:
-            if field in prepared and prepared[field] is not None:
-                prepared[field] = bool(prepared[field])
+            Coercion function, or None if the value is used as-is
+        """
+        if field in self.NUMERIC_FIELDS:
+            return _coerce_float
+        if field in self.INTEGER_FIELDS:
+            return _coerce_int
+        if field in self.BOOLEAN_FIELDS:
+            return _coerce_bool
+        return None
+
+    def _coercion_plan(self, needed_vars: Iterable[str]) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Build the (variable, coercion function) plan for a condition
         
-        return prepared
+        Args:
+            needed_vars: Variables referenced by the condition
+            
+        Returns:
+            Tuple of (name, coerce function or None) pairs
+        """
+        return tuple((name, self._coercer_for(name)) for name in sorted(needed_vars))
 
-    def _validate_condition(self, condition: str, data: Dict[str, Any]) -> Tuple[bool, Set[str]]:
+    def _apply_coercion_plan(self, data: Dict[str, Any], plan: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
         """
-        Validate that all required variables exist in the data
+        Look up, default and coerce just the variables in a coercion plan
         
         Args:
-            condition: Condition string to validate
-            data: Data dictionary to check against
+            data: Raw input data dictionary
+            plan: Result of _coercion_plan()
             
         Returns:
-            Tuple of (is_valid, missing_variables)
+            Prepared data for the planned variables
         """
-        required_vars = self._extract_variable_names(condition)
-        available_vars = set(data.keys())
-        missing_vars = required_vars - available_vars
+        defaults = self.DEFAULT_VALUES
+        prepared = {}
+        
+        for name, coerce in plan:
+            value = data.get(name)
+            if value is None:
+                if name not in defaults:
+                    continue
+                value = defaults[name]
+            prepared[name] = value if coerce is None else coerce(name, value)
         
-        return (len(missing_vars) == 0, missing_vars)
+        return prepared
 
     def evaluate(self, condition: str, data: Dict[str, Any]) -> bool:
         """
@@ -279,72 +543,220 @@ class ConditionParser:
             >>> parser.evaluate("payment_conduct_code >= 3", {"payment_conduct_code": 1})
             False
         """
-        self.stats['total_evaluations'] += 1
+        # Step 1: Normalize the condition
+        normalized_condition = self._normalize_condition(condition)
         
-        try:
-            # Step 1: Normalize the condition
-            normalized_condition = self._normalize_condition(condition)
+        if not normalized_condition:
+            self._state().total += 1
+            self.logger.warning("Empty condition provided")
+            return False
+        
+        # Step 1b: Parse/compile once per distinct condition (cached)
+        compiled = self._compile_or_raise(condition, normalized_condition)
+        
+        return self._evaluate_compiled(condition, compiled, data)
+
+    def compile(self, condition: str) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Compile a condition once and return a callable evaluating it
+        
+        The callable behaves like evaluate(condition, data) (statistics
+        included) but skips normalization and the compile-cache lookup.
+        
+        Args:
+            condition: Boolean condition string
             
-            if not normalized_condition:
-                self.logger.warning("Empty condition provided")
-                return False
+        Returns:
+            Function taking a data dictionary and returning a bool
             
-            # Step 2: Prepare data with defaults
-            prepared_data = self._prepare_data(data)
+        Raises:
+            ParserError: If the condition cannot be parsed
             
-            # Step 3: Validate (optional, for debugging)
-            if self.logger.isEnabledFor(logging.DEBUG):
-                is_valid, missing = self._validate_condition(normalized_condition, prepared_data)
-                if not is_valid:
-                    self.logger.debug(f"Condition has missing variables (will use defaults): {missing}")
-                
-                required_vars = self._extract_variable_names(normalized_condition)
-                var_values = {var: prepared_data.get(var, 'MISSING') for var in required_vars}
-                self.logger.debug(f"Evaluating: {normalized_condition}")
-                self.logger.debug(f"Variables: {var_values}")
+        Example:
+            >>> check = ConditionParser().compile("creditutilizationratio > 80")
+            >>> check({"creditutilizationratio": 85})
+            True
+        """
+        normalized_condition = self._normalize_condition(condition)
+        
+        if not normalized_condition:
+            return partial(self.evaluate, condition)
+        
+        compiled = self._compile_condition(normalized_condition)
+        if type(compiled) is _CompileFailure:
+            raise ParserError(compiled.message)
+        
+        return partial(self._evaluate_compiled, condition, compiled)
+
+    def compile_many(self, conditions: List[str]) -> 'ConditionSet':
+        """
+        Compile several conditions into one callable evaluating all of them
+        
+        Fast-path conditions share a single prepared (defaulted/coerced)
+        variable dict per record instead of preparing one per condition;
+        the others are evaluated as by evaluate().
+        
+        Args:
+            conditions: Non-empty condition strings
             
-            # Step 4: Load variables into interpreter
-            for key, value in prepared_data.items():
-                self.aeval.symtable[key] = value
+        Returns:
+            ConditionSet; call it with a data dictionary to get one entry
+            per condition: the boolean result, or the ParserError raised
+            while evaluating that condition (the other results are
+            unaffected)
             
-            # Step 5: Evaluate the condition
-            result = self.aeval(normalized_condition)
+        Raises:
+            ParserError: If any condition cannot be parsed
+        """
+        entries = []
+        shared_plan = {}
+        for condition in conditions:
+            normalized_condition = self._normalize_condition(condition)
+            compiled = self._compile_condition(normalized_condition) if normalized_condition else None
+            if compiled is None or type(compiled) is _CompileFailure:
+                raise ParserError(compiled.message if compiled else "Empty condition provided")
+            if compiled.code is not None:
+                shared_plan.update(compiled.plan)
+            entries.append((condition, compiled, compiled.code is not None))
+        
+        return ConditionSet(self, entries, tuple(sorted(shared_plan.items())))
+
+    def _compile_or_raise(self, condition: str, normalized_condition: str) -> CompiledCondition:
+        """
+        Compile a normalized condition, converting failures to ParserError
+        
+        Args:
+            condition: Original condition string (for error messages)
+            normalized_condition: Normalized condition string
             
-            # Step 6: Handle result
-            if result is None:
-                self.logger.warning(f"Condition returned None: {normalized_condition}")
-                self.stats['failed_evaluations'] += 1
-                return False
+        Returns:
+            Cached compile result from _compile_condition()
             
-            # Convert to boolean
-            bool_result = bool(result)
-            self.stats['successful_evaluations'] += 1
+        Raises:
+            ParserError: If the condition cannot be parsed
+        """
+        compiled = self._compile_condition(normalized_condition)
+        
+        if type(compiled) is _CompileFailure:
+            self.logger.error(f"{compiled.log_prefix} '{condition}': {compiled.error}")
+            state = self._state()
+            state.total += 1
+            state.fail += 1
+            raise ParserError(compiled.message)
+        
+        return compiled
+
+    def _evaluate_compiled(self, condition: str, compiled: CompiledCondition, data: Dict[str, Any]) -> bool:
+        """
+        Evaluate an already-compiled condition against one record
+        
+        Args:
+            condition: Original condition string (for error messages)
+            compiled: Result of _compile_condition()
+            data: Dictionary of variable values
             
-            return bool_result
+        Returns:
+            Boolean result of the condition evaluation
             
-        except NameError as e:
-            # Variable not found (shouldn't happen with defaults, but log it)
-            self.logger.error(f"NameError in condition '{condition}': {e}")
-            self.logger.error(f"Available variables: {list(data.keys())}")
+        Raises:
+            ParserError: If the condition cannot be evaluated
+        """
+        # Step 2: Prepare defaults/types for the referenced variables only
+        prepared_data = self._apply_coercion_plan(data, compiled.plan)
+        
+        return self._evaluate_prepared(condition, compiled, prepared_data)
+
+    def _evaluate_prepared(self, condition: str, compiled: CompiledCondition,
+                           prepared_data: Dict[str, Any]) -> bool:
+        """
+        Evaluate an already-compiled condition against prepared variables
+        
+        Args:
+            condition: Original condition string (for error messages)
+            compiled: Result of _compile_condition()
+            prepared_data: Output of _apply_coercion_plan()
             
-            # Track missing variable
-            var_name = str(e).split("'")[1] if "'" in str(e) else "unknown"
-            self.stats['missing_variables'][var_name] = self.stats['missing_variables'].get(var_name, 0) + 1
+        Returns:
+            Boolean result of the condition evaluation
             
-            self.stats['failed_evaluations'] += 1
-            return False
+        Raises:
+            ParserError: If the condition cannot be evaluated
+        """
+        state = self._state()
+        state.total += 1
+        normalized_condition = compiled.normalized
+        required_vars = compiled.variables
+        code = compiled.code
+        
+        # Step 3: Validate (optional, for debugging)
+        if self._debug:
+            missing = required_vars - prepared_data.keys()
+            if missing:
+                self.logger.debug(f"Condition has missing variables (will use defaults): {missing}")
             
-        except SyntaxError as e:
-            # Invalid Python syntax
-            self.logger.error(f"SyntaxError in condition '{condition}': {e}")
-            self.stats['failed_evaluations'] += 1
-            raise ParserError(f"Invalid condition syntax: {str(e)}")
+            var_values = {var: prepared_data.get(var, 'MISSING') for var in required_vars}
+            self.logger.debug(f"Evaluating: {normalized_condition}")
+            self.logger.debug(f"Variables: {var_values}")
+        
+        if code is not None:
+            # Step 4/5 (fast path): Run the compiled bytecode directly. Every
+            # name has a default here, so lookups cannot raise NameError.
+            try:
+                result = eval(code, _SAFE_GLOBALS, prepared_data)
+            except (ArithmeticError, TypeError, ValueError) as e:
+                # Match asteval, which reports runtime errors as None
+                self.logger.debug(f"Runtime error in condition '{normalized_condition}': {e}")
+                result = None
+            except Exception as e:
+                self._raise_unexpected(state, condition, e)
+        else:
+            aeval = state.aeval
             
-        except Exception as e:
-            # Other unexpected errors
-            self.logger.error(f"Unexpected error evaluating condition '{condition}': {e}", exc_info=True)
-            self.stats['failed_evaluations'] += 1
-            raise ParserError(f"Failed to evaluate condition: {str(e)}")
+            # Names that are neither supplied, defaulted nor asteval builtins
+            if len(prepared_data) != len(compiled.plan):
+                for name, _ in compiled.plan:
+                    if name not in prepared_data and name not in state.base_symtable:
+                        state.missing[name] += 1
+            
+            # Step 4: Bind variables as a layer over the base symbol table
+            # (no per-key writes, nothing leaks into the next evaluation)
+            aeval.symtable = ChainMap(prepared_data, state.base_symtable)
+            
+            # Step 5: Evaluate the cached AST (clear errors from previous runs first)
+            aeval.error = []
+            aeval.error_msg = None
+            try:
+                result = aeval.run(compiled.parsed, expr=normalized_condition, with_raise=False)
+            except Exception as e:
+                self._raise_unexpected(state, condition, e)
+            finally:
+                aeval.symtable = state.base_symtable
+        
+        # Step 6: Handle result
+        if result is None:
+            self.logger.warning(f"Condition returned None: {normalized_condition}")
+            state.fail += 1
+            return False
+        
+        # Convert to boolean
+        state.success += 1
+        return bool(result)
+
+    def _raise_unexpected(self, state: _ThreadState, condition: str, error: Exception):
+        """
+        Record and re-raise an unexpected evaluation error as ParserError
+        
+        Args:
+            state: Calling thread's state (for statistics)
+            condition: Original condition string (for error messages)
+            error: The unexpected exception
+            
+        Raises:
+            ParserError: Always
+        """
+        self.logger.error(f"Unexpected error evaluating condition '{condition}': {error}", exc_info=True)
+        state.fail += 1
+        raise ParserError(f"Failed to evaluate condition: {str(error)}") from error
 
     def test_condition(self, condition: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -364,21 +776,26 @@ class ConditionParser:
             # Normalize condition
             normalized = self._normalize_condition(condition)
             
-            # Prepare data
-            prepared = self._prepare_data(data)
-            
-            # Extract variables
-            required_vars = self._extract_variable_names(normalized)
+            if normalized:
+                # Compile once; variables and coercion plan come from the same object
+                compiled = self._compile_or_raise(condition, normalized)
+                required_vars = compiled.variables
+                prepared = self._apply_coercion_plan(data, compiled.plan)
+                
+                # Evaluate with the already-prepared values
+                result = self._evaluate_prepared(condition, compiled, prepared)
+            else:
+                required_vars = frozenset()
+                prepared = {}
+                result = self.evaluate(condition, data)
             
-            # Check for missing
-            is_valid, missing = self._validate_condition(normalized, prepared)
+            # Variables with neither a value nor a default
+            missing = required_vars.difference(prepared)
+            is_valid = not missing
             
             # Get actual values used
             var_values = {var: prepared.get(var) for var in required_vars}
             
-            # Evaluate
-            result = self.evaluate(condition, data)
-            
             return {
                 'success': True,
                 'result': result,
@@ -401,32 +818,47 @@ class ConditionParser:
 
     def get_statistics(self) -> Dict[str, Any]:
         """
-        Get parser usage statistics
+        Get parser usage statistics (summed over all threads)
         
         Returns:
             Dictionary with evaluation statistics
         """
+        stats = self.stats
+        
         success_rate = 0.0
-        if self.stats['total_evaluations'] > 0:
-            success_rate = (self.stats['successful_evaluations'] / 
-                          self.stats['total_evaluations'] * 100)
+        if stats['total_evaluations'] > 0:
+            success_rate = stats['successful_evaluations'] / stats['total_evaluations'] * 100
         
         return {
-            'total_evaluations': self.stats['total_evaluations'],
-            'successful_evaluations': self.stats['successful_evaluations'],
-            'failed_evaluations': self.stats['failed_evaluations'],
+            'total_evaluations': stats['total_evaluations'],
+            'successful_evaluations': stats['successful_evaluations'],
+            'failed_evaluations': stats['failed_evaluations'],
             'success_rate': f"{success_rate:.1f}%",
-            'missing_variables': self.stats['missing_variables']
+            'missing_variables': stats['missing_variables']
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Raw statistics counters as a dictionary (summed over all threads)"""
+        totals = _Counters()
+        with self._states_lock:
+            totals.add(self._retired)
+            for state in self._states:
+                totals.add(state)
+        
+        return {
+            'total_evaluations': totals.total,
+            'successful_evaluations': totals.success,
+            'failed_evaluations': totals.fail,
+            'missing_variables': dict(totals.missing)
         }
 
     def reset_statistics(self):
         """Reset all statistics counters"""
-        self.stats = {
-            'total_evaluations': 0,
-            'successful_evaluations': 0,
-            'failed_evaluations': 0,
-            'missing_variables': {}
-        }
+        with self._states_lock:
+            self._retired.reset()
+            for state in self._states:
+                state.reset()
 
 
 # Convenience functions for testing
@@ -8,10 +8,56 @@ Key improvements:
 5. ✅ NEW: Recommendations are now rendered through Jinja2 templates
 """
 
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, List, Any, Tuple
 import json
 import logging
+import math
+import re
+import sys
+
+try:
+    import orjson  # Optional: much faster JSON encoding/decoding
+except ImportError:
+    orjson = None
+
+# Rule priority -> insight severity (unknown priorities map to 'medium')
+SEVERITY_MAP = {
+    'critical': 'critical',
+    'high': 'high',
+    'medium': 'medium',
+    'low': 'low',
+    'positive': 'positive'
+}
+
+def _intern(value: Any) -> Any:
+    """sys.intern strings (rule metadata repeats across every insight); other values as-is"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@lru_cache(maxsize=16)
+def _read_rules_file(path: str, mtime_ns: int, size: int) -> Tuple[Dict[str, Any], ...]:
+    """
+    Parse a rules file (memoized on path + modification time + size)
+    
+    Engines built repeatedly from an unchanged file skip re-parsing it.
+    Callers must copy the rule dicts before modifying them.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode('utf-8'))
+    return tuple(data.get('rules', []))
+
+
+# Static rule fields shared by engines built from an unchanged rules file:
+# (engine class, path) -> ((mtime_ns, size), (alias regex, read-only rules)).
+# Least recently used entries are dropped beyond _PREPARED_RULES_SIZE.
+_PREPARED_RULES_SIZE = 16
+_prepared_rules: 'OrderedDict[Tuple[type, str], Tuple[Tuple[int, int], Tuple]]' = OrderedDict()
+
 
 class RuleEngine:
     """
@@ -24,70 +70,206 @@ class RuleEngine:
         'creditutilizationratio': 'creditutilizationratio',
     }
 
-    REVOLVING_FACILITIES = ['CRDTCARD', 'OVRDRAFT']
-    INSTALLMENT_FACILITIES = ['HSLNFNCE', 'PCPASCAR', 'OTLNFNCE', 'MICROEFN']
+    REVOLVING_FACILITIES = frozenset({'CRDTCARD', 'OVRDRAFT'})
+    INSTALLMENT_FACILITIES = frozenset({'HSLNFNCE', 'PCPASCAR', 'OTLNFNCE', 'MICROEFN'})
+
+    # Fields that only appear on aggregate/portfolio-level records
+    AGGREGATE_INDICATORS = frozenset({
+        'numberofloans', 'numapplicationslast12months', 'distinct_account_types',
+        'trade_ref_amount_overdue', 'legal_cases_settled', 'legal_cases_active'
+    })
+
+    # Record contexts a rule can apply to (bit positions in rule['_apply_mask'])
+    CTX_AGGREGATE = 0
+    CTX_LOAN = 1
+    CTX_REVOLVING_LOAN = 2
+    RECORD_CONTEXTS = {
+        CTX_AGGREGATE: ('aggregate', False),
+        CTX_LOAN: ('loan', False),
+        CTX_REVOLVING_LOAN: ('loan', True),
+    }
 
     def __init__(self, rules_file: str):
         self.rules_file = Path(rules_file)
         self.logger = logging.getLogger(__name__)
         
+        try:
+            stat = self.rules_file.stat()
+        except Exception as e:
+            self.logger.error(f"Failed to load rules: {e}")
+            raise
+        
         # Import here to avoid circular dependency
         from engine.condition_parser import ConditionParser
         from engine.template_renderer import TemplateRenderer
         
+        # Per engine, so evaluation statistics and templates are not shared
         self.parser = ConditionParser()
         self.renderer = TemplateRenderer()
-        self.rules = self._load_rules()
+        
+        # Reuse the static rule fields of an earlier engine for the same,
+        # unchanged file; conditions and templates are compiled per engine
+        version = (stat.st_mtime_ns, stat.st_size)
+        cache_key = (type(self), str(self.rules_file))
+        cached = _prepared_rules.get(cache_key)
+        if cached is not None and cached[0] == version:
+            _prepared_rules.move_to_end(cache_key)
+            self._alias_re, prepared = cached[1]
+        else:
+            # Matches {{alias}}, {{ alias }} and {alias} for every field alias
+            alias_names = '|'.join(map(re.escape, self.FIELD_ALIASES))
+            self._alias_re = re.compile(
+                r'\{\{(?:(' + alias_names + r')| (' + alias_names + r') )\}\}|\{(' + alias_names + r')\}'
+            )
+            prepared = tuple(MappingProxyType(rule) for rule in self._load_rules(version))
+            _prepared_rules[cache_key] = (version, (self._alias_re, prepared))
+            if len(_prepared_rules) > _PREPARED_RULES_SIZE:
+                _prepared_rules.popitem(last=False)
+        
+        self.rules = [dict(rule) for rule in prepared]
+        for rule in self.rules:
+            self._compile_rule(rule)
+        self._index_rules()
 
-    def _load_rules(self) -> List[Dict[str, Any]]:
-        """Load and validate rules from JSON file"""
+    def _load_rules(self, version: Tuple[int, int]) -> List[Dict[str, Any]]:
+        """Load rules from JSON file with their static fields (version: its mtime_ns and size)"""
         try:
-            with open(self.rules_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('rules', [])
+            # Shallow copies: _prepare_static_fields adds keys to them
+            rules = [dict(rule) for rule in _read_rules_file(str(self.rules_file), *version)]
         except Exception as e:
             self.logger.error(f"Failed to load rules: {e}")
             raise
+        
+        for rule in rules:
+            self._prepare_static_fields(rule)
+        
+        return rules
 
-    def _detect_record_type(self, record: Dict[str, Any]) -> str:
+    def _prepare_rule(self, rule: Dict[str, Any]):
+        """Precompute per-rule artifacts used by process_data (static fields, condition, templates)"""
+        self._prepare_static_fields(rule)
+        self._compile_rule(rule)
+
+    def _compile_rule(self, rule: Dict[str, Any]):
+        """Validate the rule's condition and compile its templates with this engine's renderer"""
+        from engine.condition_parser import ParserError
+        
+        # Matching goes through the per-context ConditionSets; compiling
+        # here only validates the condition (and warms the parser's cache)
+        rule['_valid'] = False
+        condition = rule.get('condition', '')
+        if condition:
+            try:
+                self.parser.compile(condition)
+                rule['_valid'] = True
+            except ParserError as e:
+                # Fail once at load time instead of once per record
+                self.logger.error(f"Rule {rule.get('id')} ({rule.get('label')}) disabled, invalid condition: {e}")
+        
+        rule['_message_tpl'] = self._compile_rule_template(rule, rule.get('template', '') or '')
+        rule['_recommendation_tpl'] = self._compile_rule_template(rule, rule.get('recommendation', '') or '')
+
+    def _prepare_static_fields(self, rule: Dict[str, Any]):
+        """Precompute the rule fields that only depend on the rule itself (shareable across engines)"""
+        rule['_priority'] = rule.get('priority', '').lower()
+        rule['_severity'] = SEVERITY_MAP.get(rule['_priority'], 'medium')
+        rule['_label'] = _intern(rule.get('label', ''))
+        rule['_type'] = _intern(rule.get('compound_type', ''))
+        # Insights are deduplicated on (label, compound_type) + rendered message
+        rule['_dedup_key'] = (_intern(rule.get('label')), _intern(rule.get('compound_type')))
+        rule['_data_source'] = rule.get('data_source', '')
+        rule['_id'] = _intern(rule.get('id', ''))
+        rule['_group'] = _intern(rule.get('group', ''))
+        rule['_impact'] = rule.get('impact_score', 0)
+        rule['_apply_mask'] = self._applicability_mask(rule)
+
+    def _index_rules(self):
+        """Bucket self.rules by record context and compile one condition evaluator per bucket"""
+        self._indexed_rules = list(self.rules)
+        self._rules_by_ctx = self._bucket_rules(self._indexed_rules)
+        self._conditions_by_ctx = {
+            ctx: self.parser.compile_many([rule['condition'] for rule in bucket])
+            for ctx, bucket in self._rules_by_ctx.items()
+        }
+
+    def _bucket_rules(self, rules: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
         """
-        Detect if record is a loan-level or aggregate/portfolio-level record
+        Partition rules by the record contexts they apply to (rule order kept)
+        
+        Rules without a usable condition can never match and are left out.
+        """
+        return {
+            ctx: [rule for rule in rules if rule['_valid'] and rule['_apply_mask'] & (1 << ctx)]
+            for ctx in self.RECORD_CONTEXTS
+        }
+
+    def _applicability_mask(self, rule: Dict[str, Any]) -> int:
+        """Bitmask of the record contexts (CTX_*) the rule applies to"""
+        mask = 0
+        for ctx, (record_type, is_revolving) in self.RECORD_CONTEXTS.items():
+            if self._rule_applies(rule, record_type, is_revolving):
+                mask |= 1 << ctx
+        return mask
+
+    def _record_context(self, record: Dict[str, Any]) -> int:
         """
-        # Aggregate indicators are most reliable
-        aggregate_indicators = [
-            'numberofloans', 'numapplicationslast12months', 'distinct_account_types',
-            'trade_ref_amount_overdue', 'legal_cases_settled', 'legal_cases_active'
-        ]
+        Classify a record into one of the CTX_* contexts
         
-        if any(indicator in record for indicator in aggregate_indicators):
-            return 'aggregate'
+        Called once per record; record type and revolving status are not
+        re-derived per rule.
+        """
+        if self._detect_record_type(record) == 'aggregate':
+            return self.CTX_AGGREGATE
+        if self._is_revolving_credit(record):
+            return self.CTX_REVOLVING_LOAN
+        return self.CTX_LOAN
+
+    def _compile_rule_template(self, rule: Dict[str, Any], template: str):
+        """
+        Alias and compile a rule template once at load time
         
-        # If has facility_type, it's likely a loan record
-        if 'facility_type' in record or 'loantype' in record:
-            return 'loan'
+        Returns None for an empty template. A template that fails to compile
+        is kept as its (aliased) source so the error is reported per record
+        by render_template(), as before.
+        """
+        from engine.template_renderer import TemplateError
         
-        return 'loan'
+        template = self._apply_template_aliases(template)
+        if not template:
+            return None
+        
+        try:
+            return self.renderer.compile_template(template)
+        except TemplateError as e:
+            self.logger.error(f"Rule {rule.get('id')}: template does not compile: {e}")
+            return template
+
+    def _detect_record_type(self, record: Dict[str, Any]) -> str:
+        """
+        Detect if record is a loan-level or aggregate/portfolio-level record
+        """
+        # Aggregate indicators are most reliable; anything else is a loan
+        # (dict_keys & frozenset probes the six indicators in one C call)
+        return 'aggregate' if record.keys() & self.AGGREGATE_INDICATORS else 'loan'
 
     def _is_revolving_credit(self, record: Dict[str, Any]) -> bool:
         """Check if the loan record is revolving credit"""
-        facility_type = (
-            record.get('facility_type', '') or 
-            record.get('loan_type', '') or 
-            record.get('loantype', '')
-        )
+        facility_type = record.get('facility_type') or record.get('loan_type') or record.get('loantype')
         
         return facility_type in self.REVOLVING_FACILITIES
 
-    def _should_apply_rule(self, rule: Dict[str, Any], record: Dict[str, Any]) -> bool:
+    def _rule_applies(self, rule: Dict[str, Any], record_type: str, is_revolving: bool) -> bool:
         """
         ✅ IMPROVED: Determine if a rule should be applied based on rule group and condition
         Uses the 'group' field from rules.json for more robust logic
+        
+        Only depends on the record context, so it runs once per rule and
+        context at load time (see _applicability_mask).
         """
         rule_id = rule.get('id', '')
         rule_group = rule.get('group', '')
         condition = rule.get('condition', '')
         
-        record_type = self._detect_record_type(record)
         is_loan_record = (record_type == 'loan')
         is_aggregate = (record_type == 'aggregate')
         
@@ -95,7 +277,7 @@ class RuleEngine:
         
         # 1. UTILIZATION rules - only for revolving credit loans
         if rule_group == 'utilization':
-            return is_loan_record and self._is_revolving_credit(record)
+            return is_loan_record and is_revolving
         
         # 2. PAYMENT_CONDUCT rules - ALL loan records (not just revolving)
         elif rule_group == 'payment_conduct':
@@ -132,7 +314,7 @@ class RuleEngine:
                 return is_loan_record
             elif 'creditutilizationratio' in condition and ('is_revolving' in condition or 'revolving' in rule_id.lower()):
                 # Utilization - revolving loans only
-                return is_loan_record and self._is_revolving_credit(record)
+                return is_loan_record and is_revolving
             elif 'ctos_score' in condition:
                 # Score rules - aggregate only
                 return is_aggregate
@@ -148,7 +330,7 @@ class RuleEngine:
             # Check if it involves loan-level metrics
             if 'creditutilizationratio' in condition and 'payment_conduct_code' in condition:
                 # Utilization + payment - loan level for revolving
-                return is_loan_record and self._is_revolving_credit(record)
+                return is_loan_record and is_revolving
             elif 'creditutilizationratio' in condition and 'numapplicationslast12months' in condition:
                 # Utilization + applications - aggregate (uses both loan and portfolio data)
                 return is_aggregate
@@ -167,7 +349,7 @@ class RuleEngine:
                 return is_aggregate
             elif 'creditutilizationratio' in condition and is_loan_record:
                 # Utilization warnings - loan level for revolving
-                return self._is_revolving_credit(record)
+                return is_revolving
             elif 'numapplicationslast12months' in condition:
                 # Application warnings - aggregate
                 return is_aggregate
@@ -191,151 +373,200 @@ class RuleEngine:
 
     def _apply_template_aliases(self, template: str) -> str:
         """Replace known template variable names with normalized keys"""
-        if not template:
+        if not template or '{' not in template:
             return template
         
-        for alias, real_key in self.FIELD_ALIASES.items():
-            template = template.replace(f"{{{{{alias}}}}}", f"{{{{ {real_key} }}}}")
-            template = template.replace(f"{{{{ {alias} }}}}", f"{{{{ {real_key} }}}}")
-            template = template.replace(f"{{{alias}}}", f"{{{real_key}}}")
-        
-        return template
+        return self._alias_re.sub(self._alias_sub, template)
+
+    def _alias_sub(self, match: 're.Match') -> str:
+        """Substitution callback for _alias_re"""
+        alias = match.group(1) or match.group(2)
+        if alias:
+            return f"{{{{ {self.FIELD_ALIASES[alias]} }}}}"
+        return f"{{{self.FIELD_ALIASES[match.group(3)]}}}"
 
     def _build_render_context(self, record: Dict[str, Any], personal_info: Dict[str, Any]) -> Dict[str, Any]:
         """Build rendering context - PRESERVE numeric types"""
+        # A flat dict on purpose: every template render re-reads and copies
+        # the context, and a ChainMap(record, personal_info) layering made
+        # process_data ~2x slower than this one small copy per record.
         ctx = {**personal_info, **record}
         
-        try:
-            # ✅ KEEP numeric values as-is (don't convert to strings)
-            # Jinja2 filters need numeric types
-            
-            # Add friendly aliases (keep originals too)
-            if 'loantype' not in ctx:
-                ctx['loantype'] = ctx.get('facility_type', '')
-            if 'Facility' not in ctx:
-                ctx['Facility'] = ctx.get('loantype', ctx.get('facility_type', ''))
-            if 'Lender_Type' not in ctx:
-                ctx['Lender_Type'] = ctx.get('lendertype', ctx.get('lender', ''))
-            
-            # Ensure oldest_account_years is calculated if not present
-            if 'oldest_account_years' not in ctx and 'oldest_account_months' in ctx:
-                if ctx['oldest_account_months']:
-                    ctx['oldest_account_years'] = ctx['oldest_account_months'] / 12
-                else:
-                    ctx['oldest_account_years'] = 0.0
-                
-        except Exception as e:
-            self.logger.warning(f"Error building render context: {e}")
+        # ✅ KEEP numeric values as-is (don't convert to strings)
+        # Jinja2 filters need numeric types
+        
+        # Add friendly aliases (keep originals too)
+        if 'loantype' not in ctx:
+            ctx['loantype'] = ctx.get('facility_type', '')
+        if 'Facility' not in ctx:
+            ctx['Facility'] = ctx.get('loantype', ctx.get('facility_type', ''))
+        if 'Lender_Type' not in ctx:
+            ctx['Lender_Type'] = ctx.get('lendertype', ctx.get('lender', ''))
+        
+        # Ensure oldest_account_years is calculated if not present
+        # (a non-numeric month count is left for the template to report)
+        if 'oldest_account_years' not in ctx and 'oldest_account_months' in ctx:
+            months = ctx['oldest_account_months']
+            if not months:
+                ctx['oldest_account_years'] = 0.0
+            elif isinstance(months, (int, float)):
+                ctx['oldest_account_years'] = months / 12
         
         return ctx
 
     def process_data(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Process normalized data structure"""
-        matches = []
-        seen_insights = set()
+        """
+        Process normalized data structure
         
+        Args:
+            data: Normalized data ({'records': [...], 'personal_info': {...}})
+        
+        Returns:
+            Unique insights in record/rule order
+        """
         records = data.get('records', [])
         personal_info = data.get('personal_info', {})
         
         self.logger.info(f"Processing {len(records)} records")
         
+        # Rules added to, removed from or replaced in self.rules since the last index
+        if self._indexed_rules != self.rules:
+            for rule in self.rules:
+                if '_apply_mask' not in rule:
+                    self._prepare_rule(rule)
+            self._index_rules()
+        
+        matches = self._match_records(records, personal_info)
+                    
+        self.logger.info(f"Found {len(matches)} unique insights from {len(records)} records")
+        return matches
+
+    def _match_records(self, records: List[Dict[str, Any]],
+                       personal_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Evaluate all applicable rules on records and render the matches
+        
+        Args:
+            records: Normalized records
+            personal_info: Shared personal info for the render context
+        
+        Returns:
+            Insights, deduplicated by (rule, message)
+        """
+        from engine.template_renderer import CompiledTemplate, TemplateError
+        
+        # Resolved once: per-record debug lines are skipped entirely when off
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        
+        matches = []
+        seen_insights = set()
+        # (message template, referenced values) combinations whose insight key
+        # is already in seen_insights - lets duplicates skip rendering
+        seen_renders = set()
+        
         for record_idx, record in enumerate(records):
-            record_type = self._detect_record_type(record)
-            self.logger.debug(f"Record {record_idx}: type={record_type}")
+            record_ctx = self._record_context(record)
+            record_type = self.RECORD_CONTEXTS[record_ctx][0]
+            if debug:
+                self.logger.debug("Record %d: type=%s", record_idx, record_type)
             
-            # Build rendering context
-            render_ctx = self._build_render_context(record, personal_info)
+            # Rendering context, built on the first match (most records match few rules)
+            render_ctx = None
             
-            rules_evaluated = 0
-            rules_skipped = 0
+            # CRITICAL: Only rules that apply to this record context
+            rules_to_check = self._rules_by_ctx[record_ctx]
             
-            for rule in self.rules:
-                try:
-                    # CRITICAL: Check if rule should apply
-                    if not self._should_apply_rule(rule, record):
-                        rules_skipped += 1
+            # Evaluate every condition of the bucket in one pass
+            results = self._conditions_by_ctx[record_ctx](record)
+            
+            for rule, matched in zip(rules_to_check, results):
+                if matched is False:
+                    continue
+                
+                if matched is not True:
+                    # ParserError from evaluating this rule's condition
+                    self.logger.error("Error evaluating rule %s (%s) on record %d: %s",
+                                      rule.get('id'), rule.get('label'), record_idx, matched)
+                    continue
+                
+                # Rule matched - render both message AND recommendation
+                # (templates were aliased and compiled in _load_rules)
+                if render_ctx is None:
+                    render_ctx = self._build_render_context(record, personal_info)
+                message_tpl = rule['_message_tpl']
+                
+                # Same template with the same inputs -> same message,
+                # already deduplicated: skip rendering altogether
+                render_key = None
+                if isinstance(message_tpl, CompiledTemplate):
+                    render_key = (rule['_dedup_key'], message_tpl.render_key(render_ctx))
+                    if render_key[1] is None:
+                        render_key = None
+                    elif render_key in seen_renders:
                         continue
+                
+                # Rendering is the only step that can still fail per record
+                # (conditions and templates were validated at load time)
+                try:
+                    message = self.renderer.render_template(message_tpl, render_ctx) if message_tpl else ''
                     
-                    rules_evaluated += 1
-                    
-                    condition = rule.get('condition', '')
-                    if not condition:
+                    # Deduplication
+                    insight_key = (rule['_dedup_key'], message)
+                    if insight_key in seen_insights:
+                        if render_key is not None:
+                            seen_renders.add(render_key)
                         continue
-                        
-                    if self.parser.evaluate(condition, record):
-                        # Rule matched - render both message AND recommendation
-                        template = rule.get('template', '') or ''
-                        template_for_render = self._apply_template_aliases(template)
-                        message = self.renderer.render_template(template_for_render, render_ctx) if template_for_render else ''
-                        
-                        # ✅ NEW: Render recommendation through Jinja2 too
-                        recommendation_template = rule.get('recommendation', '') or ''
-                        recommendation_for_render = self._apply_template_aliases(recommendation_template)
-                        recommendation = self.renderer.render_template(recommendation_for_render, render_ctx) if recommendation_for_render else ''
-                        
-                        # Deduplication
-                        insight_key = f"{rule.get('label')}:{rule.get('compound_type')}:{message}"
-                        if insight_key in seen_insights:
-                            continue
-                            
-                        seen_insights.add(insight_key)
-                        
-                        # Map priority to severity
-                        priority = rule.get('priority', '').lower()
-                        severity_map = {
-                            'critical': 'critical',
-                            'high': 'high',
-                            'medium': 'medium',
-                            'low': 'low',
-                            'positive': 'positive'
-                        }
-                        severity = severity_map.get(priority, 'medium')
-                        
-                        insight = {
-                            'label': rule.get('label', ''),
-                            'type': rule.get('compound_type', ''),
-                            'message': message,
-                            'recommendation': recommendation,  # ✅ Now fully rendered
-                            'severity': severity,
-                            'priority': priority,
-                            'data_source': rule.get('data_source', ''),
-                            'record_type': record_type,
-                            'rule_id': rule.get('id', ''),
-                            'rule_group': rule.get('group', ''),
-                            'impact_score': rule.get('impact_score', 0),
-                            'data': record
-                        }
-                        matches.append(insight)
-                        
-                except Exception as e:
-                    self.logger.error(f"Error evaluating rule {rule.get('id')} ({rule.get('label')}) on record {record_idx}: {e}")
+                    
+                    # ✅ NEW: Render recommendation through Jinja2 too
+                    recommendation_tpl = rule['_recommendation_tpl']
+                    recommendation = self.renderer.render_template(recommendation_tpl, render_ctx) if recommendation_tpl else ''
+                except TemplateError as e:
+                    self.logger.error("Error evaluating rule %s (%s) on record %d: %s",
+                                      rule.get('id'), rule.get('label'), record_idx, e)
                     continue
-            
-            self.logger.debug(f"Record {record_idx}: evaluated {rules_evaluated} rules, skipped {rules_skipped} rules")
                     
-        self.logger.info(f"Found {len(matches)} unique insights from {len(records)} records")
+                seen_insights.add(insight_key)
+                if render_key is not None:
+                    seen_renders.add(render_key)
+                
+                # Static per-rule fields (including priority -> severity)
+                # were precomputed in _prepare_rule
+                insight = {
+                    'label': rule['_label'],
+                    'type': rule['_type'],
+                    'message': message,
+                    'recommendation': recommendation,  # ✅ Now fully rendered
+                    'severity': rule['_severity'],
+                    'priority': rule['_priority'],
+                    'data_source': rule['_data_source'],
+                    'record_type': record_type,
+                    'rule_id': rule['_id'],
+                    'rule_group': rule['_group'],
+                    'impact_score': rule['_impact'],
+                    'data': record
+                }
+                matches.append(insight)
+            
+            if debug:
+                self.logger.debug("Record %d: evaluated %d rules, skipped %d rules",
+                                  record_idx, len(rules_to_check), len(self.rules) - len(rules_to_check))
+        
         return matches
 
     def generate_report(self, insights: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate a summary report from insights"""
-        label_counts = {}
-        severity_counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'positive': 0}
-        group_counts = {}
-        total_impact = 0
-        
-        for insight in insights:
-            label = insight.get('label', 'Unknown')
-            severity = insight.get('severity', 'medium')
-            group = insight.get('rule_group', 'unknown')
-            impact = insight.get('impact_score', 0)
-            
-            label_counts[label] = label_counts.get(label, 0) + 1
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
-            group_counts[group] = group_counts.get(group, 0) + 1
-            
-            # Sum impact scores (negative for positive insights)
-            if severity != 'positive':
-                total_impact += impact
+        label_counts = dict(Counter(insight.get('label', 'Unknown') for insight in insights))
+        severity_counts = {
+            'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'positive': 0,
+            **Counter(insight.get('severity', 'medium') for insight in insights)
+        }
+        group_counts = dict(Counter(insight.get('rule_group', 'unknown') for insight in insights))
+        
+        # Sum impact scores (positive insights don't add risk)
+        total_impact = sum(
+            insight.get('impact_score', 0) for insight in insights
+            if insight.get('severity', 'medium') != 'positive'
+        )
         
         # Calculate overall risk level
         if total_impact >= 200:
@@ -362,11 +593,32 @@ class RuleEngine:
         return report
 
 
+def _finite_json(value: Any) -> Any:
+    """Copy of value with NaN/infinite floats replaced by None (orjson writes them as null)"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_json(item) for item in value]
+    return value
+
+
 def save_report(report: Dict, output_file: str):
-    """Save report to JSON file"""
+    """
+    Save report to JSON file (uses orjson when installed)
+    
+    Both paths write the same file: UTF-8, 2-space indent, non-finite
+    floats as null. The report is serialized before the file is opened,
+    so a serialization error leaves no truncated file behind.
+    """
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=4, ensure_ascii=False)
+        if orjson is not None:
+            payload = orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(_finite_json(report), indent=2, ensure_ascii=False).encode('utf-8')
+        with open(output_file, 'wb') as f:
+            f.write(payload)
         print(f"✓ Report saved to: {output_file}")
     except Exception as e:
         print(f"✗ Error saving report: {e}")
@@ -1,17 +1,79 @@
-from jinja2 import Environment, BaseLoader, StrictUndefined, UndefinedError
-from typing import Any, Dict
+from jinja2 import Environment, BaseLoader, StrictUndefined, UndefinedError, meta
+from typing import Any, Dict, Union
 import json
 import logging
 import re
 from datetime import datetime
 from pathlib import Path
 from string import Template
+from types import MappingProxyType
 
 class TemplateError(Exception):
     """Custom exception for template rendering errors"""
     pass
 
+# Placeholder for variables absent from the render data (see render_key)
+_MISSING = object()
+
+
+def _render_key_value(value):
+    """Key element for one template input: equal only if it renders the same"""
+    value_type = type(value)
+    if value_type is float:
+        return float, repr(value)
+    return value_type, value
+
+
+class CompiledTemplate:
+    """A template string parsed and compiled once, ready for repeated rendering"""
+    
+    __slots__ = ('source', 'template', 'variables', 'referenced', 'fallbacks', 'static')
+    
+    def __init__(self, source: str, template, variables: frozenset, referenced: tuple, fallbacks: Dict[str, Any],
+                 static: str = None):
+        self.source = source
+        self.template = template
+        self.variables = variables      # {{ var }} placeholders (validated before rendering)
+        self.referenced = referenced    # every name the template reads, filters included
+        self.fallbacks = fallbacks
+        self.static = static            # rendered text of a template with no Jinja syntax, else None
+
+    def render_key(self, data: Dict[str, Any]):
+        """
+        Hashable key that determines this template's output for the given data
+        
+        Two data dicts with equal keys render to the same text, so callers
+        can skip rendering a combination they have already seen. Values are
+        keyed by type as well, since 3, 3.0 and True compare equal but render
+        differently; floats are keyed by repr so -0.0 and nan stay distinct.
+        
+        Returns:
+            Tuple key, or None if a referenced value is unhashable
+        """
+        key = (self, tuple(_render_key_value(data.get(name, _MISSING)) for name in self.referenced))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+
 class TemplateRenderer:
+    # Values for common variables missing from the render data
+    DEFAULT_VALUES = MappingProxyType({
+        'Facility': 'facility',
+        'loantype': 'loan',
+        'Lender_Type': 'lender',
+        'lendertype': 'lender',
+        'balance': 0.0,
+        'limit': 0.0,
+        'creditutilizationratio': 0.0,
+        'case_types': '',
+        'case_details': '',
+        'oldest_account_years': 0.0,
+        'oldest_account_months': 0
+    })
+
     def __init__(self, templates_file: str = None):
         """Initialize template engine with custom filters and settings"""
         # CRITICAL FIX: Use StrictUndefined to catch missing variables
@@ -95,22 +157,7 @@ class TemplateRenderer:
 
     def _add_default_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Add default values for common variables if missing"""
-        defaults = {
-            'Facility': 'facility',
-            'loantype': 'loan',
-            'Lender_Type': 'lender',
-            'lendertype': 'lender',
-            'balance': 0.0,
-            'limit': 0.0,
-            'creditutilizationratio': 0.0,
-            'case_types': '',
-            'case_details': '',
-            'oldest_account_years': 0.0,
-            'oldest_account_months': 0
-        }
-        
-        result = {**defaults, **data}
-        return result
+        return {**self.DEFAULT_VALUES, **data}
 
     def format_value(self, value: Any, format_type: str) -> str:
         """Format a value according to specified type"""
@@ -123,32 +170,87 @@ class TemplateRenderer:
             self.logger.error(f"Error formatting value: {str(e)}")
             return str(value)
 
-    def render_template(self, template_string: str, data: Dict[str, Any]) -> str:
+    @staticmethod
+    def _static_text(template_str: str):
+        """
+        Rendered output of a template that needs no substitution, or None
+        
+        Without any '{' there are no expressions, statements or comments, so
+        Jinja would return the text unchanged - except that it strips a single
+        trailing newline and normalizes '\\r' line endings, hence those are
+        left to Jinja.
+        """
+        if '{' in template_str or '\r' in template_str or template_str.endswith('\n'):
+            return None
+        return template_str
+
+    def compile_template(self, template_string: str) -> CompiledTemplate:
+        """
+        Resolve, parse and compile a template once for repeated rendering
+        
+        Args:
+            template_string: Template string, or a template name from self.templates
+            
+        Returns:
+            CompiledTemplate to pass to render_template()
+            
+        Raises:
+            TemplateError: If the template cannot be compiled
+        """
+        # If template_string is actually a template name (key in self.templates)
+        if template_string in self.templates:
+            template_data = self.templates[template_string]
+            template_str = template_data['message']
+            fallbacks = template_data.get('fallbacks', {})
+        else:
+            template_str = template_string
+            fallbacks = {}
+        
+        static = self._static_text(template_str)
+        if static is not None:
+            # Plain literal: no need to parse or render it through Jinja
+            return CompiledTemplate(template_str, None, frozenset(), (), fallbacks, static)
+        
+        try:
+            parsed = self.env.parse(template_str)
+            referenced = tuple(sorted(meta.find_undeclared_variables(parsed)))
+            template = self.env.from_string(parsed)
+        except Exception as e:
+            self.logger.error(f"Template compile error: {str(e)}")
+            self.logger.error(f"Template: {template_str[:100]}...")
+            raise TemplateError(f"Failed to render template: {str(e)}")
+        
+        return CompiledTemplate(template_str, template, frozenset(self._extract_variables(template_str)),
+                                referenced, fallbacks)
+
+    def render_template(self, template_string: Union[str, CompiledTemplate], data: Dict[str, Any]) -> str:
         """
         Render a template with provided data
         FIXED: Preserves numeric types for Jinja2 filters
         
         Args:
-            template_string: Template string with {{variable}} placeholders
+            template_string: Template string with {{variable}} placeholders,
+                or a CompiledTemplate from compile_template()
             data: Dictionary of variable values
             
         Returns:
             Rendered template string
         """
+        if isinstance(template_string, CompiledTemplate):
+            compiled = template_string
+        else:
+            compiled = self.compile_template(template_string)
+        
+        if compiled.static is not None:
+            return compiled.static
+        
+        template_str = compiled.source
+        
         try:
-            # If template_string is actually a template name (key in self.templates)
-            if template_string in self.templates:
-                template_data = self.templates[template_string]
-                template_str = template_data['message']
-                fallbacks = template_data.get('fallbacks', {})
-            else:
-                template_str = template_string
-                fallbacks = {}
-
             # CRITICAL FIX: Validate required variables
-            is_valid, missing_vars = self._validate_data(template_str, data)
+            missing_vars = compiled.variables - data.keys()
             
-            if not is_valid:
+            if missing_vars:
                 self.logger.warning(f"Missing variables in template: {missing_vars}")
                 self.logger.warning(f"Template: {template_str[:100]}...")
                 self.logger.warning(f"Available data keys: {list(data.keys())}")
@@ -157,15 +259,14 @@ class TemplateRenderer:
                 data = self._add_default_values(data)
 
             # Apply fallbacks for missing data
-            render_data = {**fallbacks, **data}
+            render_data = {**compiled.fallbacks, **data}
             
             # ✅ CRITICAL FIX: Prepare data WITHOUT converting to strings
             # Let Jinja2 handle formatting with filters
             formatted_data = self._prepare_render_context(render_data)
 
-            # Create and render template
-            template = self.env.from_string(template_str)
-            result = template.render(**formatted_data)
+            # Render the precompiled template
+            result = compiled.template.render(**formatted_data)
             
             return result
 
@@ -6,24 +6,27 @@ import PyPDF2
 import re
 from pathlib import Path
 
+# Patterns compiled once at import
+LOAN_SECTION_RE = re.compile(
+    r'Loan Information\s+Maklumat Pinjaman(.*?)(?=Special Attention|Credit Application|REMARK LEGEND)',
+    re.DOTALL | re.IGNORECASE
+)
+FACILITY_RE = re.compile(r'O\s+(OTLNFNCE|CRDTCARD|HSLNFNCE|PCPASCAR|OVRDRAFT|MICROEFN)\s+([\d,]+\.?\d*)')
+OUTSTANDING_RE = re.compile(r'Outstanding Credit.*', re.IGNORECASE)
+ROW_RE = re.compile(r'(\d+)\s+(\d{2}-\d{2}-\d{4})\s+Own')
+
 def debug_loan_section(pdf_path):
     """Extract and display loan section for debugging"""
     
     with open(pdf_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
-        full_text = ""
-        for page in reader.pages:
-            full_text += page.extract_text() + "\n"
+        full_text = "".join(page.extract_text() + "\n" for page in reader.pages)
     
     print(f"Total characters: {len(full_text)}")
     print("\n" + "="*80)
     
     # Find loan section
-    loan_section = re.search(
-        r'Loan Information\s+Maklumat Pinjaman(.*?)(?=Special Attention|Credit Application|REMARK LEGEND)',
-        full_text,
-        re.DOTALL | re.IGNORECASE
-    )
+    loan_section = LOAN_SECTION_RE.search(full_text)
     
     if loan_section:
         loan_text = loan_section.group(1)
@@ -37,9 +40,7 @@ def debug_loan_section(pdf_path):
         
         # Test facility pattern
         print("\nSearching for facility patterns...")
-        facility_pattern = r'O\s+(OTLNFNCE|CRDTCARD|HSLNFNCE|PCPASCAR|OVRDRAFT|MICROEFN)\s+([\d,]+\.?\d*)'
-        
-        matches = list(re.finditer(facility_pattern, loan_text))
+        matches = list(FACILITY_RE.finditer(loan_text))
         print(f"Found {len(matches)} facilities\n")
         
         for i, match in enumerate(matches[:3]):  # Show first 3
@@ -58,7 +59,7 @@ def debug_loan_section(pdf_path):
         
         # Try to find where loan info might be
         print("\nSearching for 'Outstanding Credit'...")
-        outstanding_match = re.search(r'Outstanding Credit.*', full_text, re.IGNORECASE)
+        outstanding_match = OUTSTANDING_RE.search(full_text)
         if outstanding_match:
             pos = outstanding_match.start()
             print(f"Found at position {pos}")
@@ -66,8 +67,7 @@ def debug_loan_section(pdf_path):
     
     print("\n" + "="*80)
     print("\nSearching for row patterns...")
-    row_pattern = r'(\d+)\s+(\d{2}-\d{2}-\d{4})\s+Own'
-    row_matches = list(re.finditer(row_pattern, full_text))
+    row_matches = list(ROW_RE.finditer(full_text))
     print(f"Found {len(row_matches)} row headers")
     
     for i, match in enumerate(row_matches[:3]):
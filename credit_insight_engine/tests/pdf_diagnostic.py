@@ -5,6 +5,46 @@ Use this to understand the PDF format and fix extraction patterns
 
 import PyPDF2
 import re
+from collections import Counter
+
+
+def _compile_all(patterns):
+    """Compile alternative section patterns once (case-insensitive, '.' spans lines)"""
+    return [re.compile(pattern, re.DOTALL | re.IGNORECASE) for pattern in patterns]
+
+
+LOAN_PATTERNS = _compile_all([
+    r'Outstanding Credit.*?Kredit Belum Jelas(.*?)(?=Total Outstanding Balance|Special Attention)',
+    r'Loan Information.*?Maklumat Pinjaman(.*?)(?=Total Outstanding|Special Attention)',
+    r'C1: BANKING.*?CCRIS DETAILS.*?Loan Information(.*?)(?=Special Attention|Total Outstanding)',
+])
+
+TRADE_PATTERNS = _compile_all([
+    r'E: TRADE REFERENCE.*?RUJUKAN PERDAGANGAN(.*?)(?=D:|F:|Note:)',
+    r'TRADE REFERENCE.*?Summary.*?Ringkasan(.*?)(?=CRA Comment|Subject)',
+])
+
+LEGAL_PATTERNS = _compile_all([
+    r'D1: LEGAL CASES.*?SUMMARY.*?RINGKASAN(.*?)(?=D2:|E: TRADE)',
+    r'LEGAL CASES.*?DEFENDANT.*?DEFENDAN(.*?)(?=D2:|PLAINTIFF)',
+])
+
+D4_PATTERNS = _compile_all([
+    r'D4:.*?COMPANY.*?WINDING.*?UP(.*?)(?=E: TRADE|Note:)',
+    r'DIRECTOR OF A COMPANY.*?WINDING(.*?)(?=E: TRADE)',
+])
+
+FACILITY_TYPES = ['OTLNFNCE', 'CRDTCARD', 'HSLNFNCE', 'PCPASCAR', 'OVRDRAFT', 'MICROEFN']
+FACILITY_TYPES_RE = re.compile('|'.join(FACILITY_TYPES))
+
+
+def keyword_context(text, keyword, width):
+    """First occurrence of keyword with `width` characters on both sides, or None"""
+    index = text.find(keyword, width)
+    if index < 0 or index + len(keyword) + width > len(text):
+        return None
+    return text[index - width:index + len(keyword) + width]
+
 
 def diagnose_pdf(pdf_file: str):
     """Extract and show PDF structure for debugging"""
@@ -14,7 +54,7 @@ def diagnose_pdf(pdf_file: str):
     print("="*80)
     
     # Extract full text
-    full_text = ""
+    page_texts = []
     try:
         with open(pdf_file, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
@@ -22,12 +62,13 @@ def diagnose_pdf(pdf_file: str):
             
             for i, page in enumerate(reader.pages):
                 page_text = page.extract_text()
-                full_text += page_text + "\n"
+                page_texts.append(page_text)
                 print(f"Page {i+1}: {len(page_text)} characters")
     except Exception as e:
         print(f"ERROR: {e}")
         return
     
+    full_text = "".join(text + "\n" for text in page_texts)
     print(f"\nTotal characters extracted: {len(full_text)}")
     
     # Save full text for inspection
@@ -41,18 +82,12 @@ def diagnose_pdf(pdf_file: str):
     print("="*80)
     
     # Try to find loan section
-    loan_patterns = [
-        r'Outstanding Credit.*?Kredit Belum Jelas(.*?)(?=Total Outstanding Balance|Special Attention)',
-        r'Loan Information.*?Maklumat Pinjaman(.*?)(?=Total Outstanding|Special Attention)',
-        r'C1: BANKING.*?CCRIS DETAILS.*?Loan Information(.*?)(?=Special Attention|Total Outstanding)',
-    ]
-    
     loan_section = None
-    for pattern in loan_patterns:
-        match = re.search(pattern, full_text, re.DOTALL | re.IGNORECASE)
+    for pattern in LOAN_PATTERNS:
+        match = pattern.search(full_text)
         if match:
             loan_section = match.group(1)
-            print(f"✓ Found loan section using pattern: {pattern[:50]}...")
+            print(f"✓ Found loan section using pattern: {pattern.pattern[:50]}...")
             break
     
     if loan_section:
@@ -69,9 +104,10 @@ def diagnose_pdf(pdf_file: str):
         
         # Look for facility types
         print("\nSearching for facility types...")
-        facility_types = ['OTLNFNCE', 'CRDTCARD', 'HSLNFNCE', 'PCPASCAR', 'OVRDRAFT', 'MICROEFN']
-        for ftype in facility_types:
-            count = len(re.findall(ftype, loan_section))
+        # One scan over the section counts every facility type
+        facility_counts = Counter(FACILITY_TYPES_RE.findall(loan_section))
+        for ftype in FACILITY_TYPES:
+            count = facility_counts[ftype]
             if count > 0:
                 print(f"  ✓ Found {count} x {ftype}")
         
@@ -79,9 +115,9 @@ def diagnose_pdf(pdf_file: str):
         if 'CRDTCARD' in loan_section:
             print("\nContext around first CRDTCARD:")
             print("-"*80)
-            match = re.search(r'.{200}CRDTCARD.{200}', loan_section, re.DOTALL)
-            if match:
-                print(match.group(0))
+            context = keyword_context(loan_section, 'CRDTCARD', 200)
+            if context:
+                print(context)
             print("-"*80)
     else:
         print("❌ Could not find loan section")
@@ -91,9 +127,9 @@ def diagnose_pdf(pdf_file: str):
             if keyword in full_text:
                 print(f"  ✓ Found: {keyword}")
                 # Show context
-                match = re.search(r'.{100}' + re.escape(keyword) + r'.{100}', full_text, re.DOTALL)
-                if match:
-                    print(f"    Context: {match.group(0)[:200]}...")
+                context = keyword_context(full_text, keyword, 100)
+                if context:
+                    print(f"    Context: {context[:200]}...")
             else:
                 print(f"  ❌ NOT found: {keyword}")
     
@@ -102,17 +138,12 @@ def diagnose_pdf(pdf_file: str):
     print("SECTION 2: TRADE REFERENCE")
     print("="*80)
     
-    trade_patterns = [
-        r'E: TRADE REFERENCE.*?RUJUKAN PERDAGANGAN(.*?)(?=D:|F:|Note:)',
-        r'TRADE REFERENCE.*?Summary.*?Ringkasan(.*?)(?=CRA Comment|Subject)',
-    ]
-    
     trade_section = None
-    for pattern in trade_patterns:
-        match = re.search(pattern, full_text, re.DOTALL | re.IGNORECASE)
+    for pattern in TRADE_PATTERNS:
+        match = pattern.search(full_text)
         if match:
             trade_section = match.group(1)
-            print(f"✓ Found trade section using pattern: {pattern[:50]}...")
+            print(f"✓ Found trade section using pattern: {pattern.pattern[:50]}...")
             break
     
     if trade_section:
@@ -133,17 +164,12 @@ def diagnose_pdf(pdf_file: str):
     print("SECTION 3: LEGAL CASES")
     print("="*80)
     
-    legal_patterns = [
-        r'D1: LEGAL CASES.*?SUMMARY.*?RINGKASAN(.*?)(?=D2:|E: TRADE)',
-        r'LEGAL CASES.*?DEFENDANT.*?DEFENDAN(.*?)(?=D2:|PLAINTIFF)',
-    ]
-    
     legal_section = None
-    for pattern in legal_patterns:
-        match = re.search(pattern, full_text, re.DOTALL | re.IGNORECASE)
+    for pattern in LEGAL_PATTERNS:
+        match = pattern.search(full_text)
         if match:
             legal_section = match.group(1)
-            print(f"✓ Found legal section using pattern: {pattern[:50]}...")
+            print(f"✓ Found legal section using pattern: {pattern.pattern[:50]}...")
             break
     
     if legal_section:
@@ -164,17 +190,12 @@ def diagnose_pdf(pdf_file: str):
     print("SECTION 4: DIRECTOR WINDING UP (D4)")
     print("="*80)
     
-    d4_patterns = [
-        r'D4:.*?COMPANY.*?WINDING.*?UP(.*?)(?=E: TRADE|Note:)',
-        r'DIRECTOR OF A COMPANY.*?WINDING(.*?)(?=E: TRADE)',
-    ]
-    
     d4_section = None
-    for pattern in d4_patterns:
-        match = re.search(pattern, full_text, re.DOTALL | re.IGNORECASE)
+    for pattern in D4_PATTERNS:
+        match = pattern.search(full_text)
         if match:
             d4_section = match.group(1)
-            print(f"✓ Found D4 section using pattern: {pattern[:50]}...")
+            print(f"✓ Found D4 section using pattern: {pattern.pattern[:50]}...")
             break
     
     if d4_section: